@@ -1,10 +1,14 @@
+import asyncio
+import io
 import os
 import re
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
 import pdfplumber
+import ahocorasick
 from fpdf import FPDF
-from telegram import Update
+from telegram import InputFile, Update
 from telegram.ext import (
     Application,
     CommandHandler,
@@ -15,97 +19,164 @@ from telegram.ext import (
 import nest_asyncio
 nest_asyncio.apply()  # Para entornos interactivos
 
+# Fechas dd/mm/aa o dd/mm/aaaa y montos con separador de miles "."
+DATE_RE = re.compile(r'\d{2}/\d{2}/\d{2,4}')
+AMOUNT_RE = re.compile(r'[-–]?\d{1,3}(?:\.\d{3})*(?:[.,]\d{2})?')
+# Estructura de cuotas en el PDF: "n/total" al final del detalle
+CUOTAS_RE = re.compile(r'(\d{1,2})/(\d{1,2})\s*$')
+# Filas que no son operaciones reales (totales, encabezados, fechas de pago)
+EXCLUDE_RE = re.compile("TOTAL OPERACIONES|MONTO CANCELADO|MOVIMIENTOS TARJETA|PAGAR HASTA|FACTURADO")
+# Línea de transacción: [lugar] fecha detalle $ monto, en una sola pasada
+LINE_RE = re.compile(
+    r'^(?P<lugar>.*?)(?P<fecha>' + DATE_RE.pattern + r')(?P<detalle>.*)'
+    r'\$\s*(?P<valor>' + AMOUNT_RE.pattern + r')'
+)
+
+def _open_pdf(source, **kwargs):
+    """
+    Abre el PDF con pdfplumber.
+    Entrada: source (ruta, archivo abierto o bytes del PDF)
+    Salida: objeto pdfplumber.PDF
+    """
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    return pdfplumber.open(source, **kwargs)
+
+# Con pocas páginas levantar procesos cuesta más que extraerlas en serie
+SERIAL_MAX_PAGES = 2
+# PDF que procesa cada worker del pool (se envía una sola vez al iniciarlo)
+_worker_source = None
+
+def _init_worker(source):
+    """
+    Guarda en el worker la ruta o los bytes del PDF a procesar.
+    """
+    global _worker_source
+    _worker_source = source
+
+def _extract_page(i):
+    """
+    Extrae el texto de una sola página del PDF del worker.
+    Entrada: i (índice de la página)
+    Salida: texto de la página (string, vacío si no tiene texto)
+    """
+    # Solo se carga la página pedida (pdfplumber numera desde 1); sin laparams
+    # pdfplumber no corre el análisis de layout de pdfminer
+    with _open_pdf(_worker_source, pages=[i + 1]) as pdf:
+        return pdf.pages[0].extract_text() or ""
+
+def _build_group_automaton(group_dict):
+    """
+    Arma un autómata Aho-Corasick con las palabras clave de group_dict (en
+    mayúsculas), para buscarlas todas en una sola pasada por el detalle.
+    Entrada: group_dict (dict palabra clave -> grupo)
+    Salida: ahocorasick.Automaton con valores (prioridad, grupo)
+    """
+    automaton = ahocorasick.Automaton()
+    for priority, (keyword, group) in enumerate(group_dict.items()):
+        automaton.add_word(keyword, (priority, group))
+    automaton.make_automaton()
+    return automaton
+
+# Diccionario de grupos (ajústalo según tus necesidades), con las claves en mayúsculas
+GROUP_DICT = {k.upper(): v for k, v in {
+    'COMERCIAL DECOSTORE': 'DECORACION',
+    'MERCADO PAGO 4 TCOM': 'GYM',
+    'UBER EATS': 'DELIVERY',
+    'UBER TRIP': 'MOVILIDAD',
+    'UBER': 'MOVILIDAD',
+    'TAXI': 'MOVILIDAD',
+    'RAPPI': 'DELIVERY',
+    'NIU': 'DELIVERY',
+    'MED': 'MEDICO',
+    'CRUZ VERDE': 'MEDICO',
+    'AHUM': 'MEDICO',
+    'SII': 'SII',
+    'SODIMAC': 'DECORACION',
+    'TOTTUS': 'SUPERMERCADO',
+    'JUMBO': 'SUPERMERCADO',
+    'BIRRA': 'SALIDA/BAR',
+    'BAR': 'SALIDA/BAR',
+    'ENTEL': 'SERVICIOS',
+    'AGUAS CORDILLERA': 'SUPERMERCADO',
+    'PLAYSTATION': 'SUBSCRIPCION',
+    'BOCAJUNIORS': 'SUBSCRIPCION',
+    'NETFLIX': 'SUBSCRIPCION',
+    'AMAZON': 'SUBSCRIPCION',
+    'APPLE': 'SUBSCRIPCION',
+    'GUACAMOLE': 'DELIVERY',
+    'FANTASILANDIA': 'SALIDA/BAR',
+    'MACONLINE': 'SEGURO',
+    'LATAM': 'VUELOS',
+    'COMUNIDAD FELIZ': 'SERVICIOS',
+    'TICKET MASTER': 'SALIDAS/BAR',
+    'NUI SUSHI': 'DELIVERY'
+}.items()}
+# El autómata del diccionario por defecto se arma una sola vez al importar
+GROUP_AUTOMATON = _build_group_automaton(GROUP_DICT)
+
 #########################
 # CLASE PDFTableExtractor
 #########################
 class PDFTableExtractor:
-    def __new__(cls, pdf_path, group_dict):
-        # Crea una instancia y realiza la extracción inmediata
+    __slots__ = (
+        'pdf_path', 'group_dict', 'group_automaton', 'text', 'df_o', 'df_resume',
+        '_fechas', '_lugares', '_detalles', '_valores',
+    )
+
+    def __new__(cls, pdf_path, group_dict=GROUP_DICT):
+        # Crea una instancia y realiza la extracción inmediata.
+        # pdf_path puede ser una ruta o un archivo ya abierto (por ejemplo, BytesIO)
         self = super().__new__(cls)
         self.pdf_path = pdf_path
         self.group_dict = group_dict
+        if group_dict is GROUP_DICT:
+            self.group_automaton = GROUP_AUTOMATON
+        else:
+            self.group_automaton = _build_group_automaton(group_dict)
         self.text = ""
-        self.transactions = []
+        # Transacciones guardadas por columna
+        self._fechas = []
+        self._lugares = []
+        self._detalles = []
+        self._valores = []
         self.df_o = pd.DataFrame()
         self.df_resume = pd.DataFrame()
         # Extrae el texto y estructura las transacciones
         self.extract_text()
         return self.struct_text(), self.transaction_resume()
     
-    @staticmethod
-    def convert_amount(val_str):
-        """
-        Convierte el valor en formato string a formato numérico (float).
-        Entrada: str (por ejemplo, "13.859,00")
-        Salida: float (por ejemplo, 13859.00)
-        """
-        if "," in val_str:
-            val_str = val_str.replace(".", "").replace(",", ".")
-        else:
-            val_str = val_str.replace(".", "")
-        try:
-            return float(val_str)
-        except Exception:
-            return None
-
-    @staticmethod
-    def transaction_validator(row):
-        """
-        Valida una fila (transacción) para filtrar aquellas que no son operaciones reales.
-        Entrada: row (una serie de pandas)
-        Salida: bool (True si es una transacción válida)
-        """
-        date_pattern = re.compile(r'\d{2}/\d{2}/\d{2,4}')
-        # Si LUGAR está vacío, se asigna "SIN LUGAR"
-        lugar = row["LUGAR"] if row["LUGAR"] and row["LUGAR"].strip() != "" else "SIN LUGAR"
-        combined = (lugar + " " + row["DETALLE"]).upper()
-        exclude_keywords = ["TOTAL OPERACIONES", "MONTO CANCELADO", "MOVIMIENTOS TARJETA", "PAGAR HASTA", "FACTURADO"]
-        if any(kw in combined for kw in exclude_keywords):
-            return False
-        if date_pattern.search(row["DETALLE"]):
-            return False
-        return True
-
-    @staticmethod
-    def struct_cuotas(text):
-        """
-        Busca un patrón con uno o dos dígitos, una barra y uno o dos dígitos 
-        (estructura de cuotas en el PDF).
-        Entrada: text (string)
-        Salida: (n_cuota, cuota_total) o (np.nan, np.nan) si no se encuentra
-        """
-        match = re.search(r'(\d{1,2})/(\d{1,2})\s*$', text)
-        if match:
-            n_cuota = int(match.group(1))
-            cuota_total = int(match.group(2))
-            return n_cuota, cuota_total
-        else:
-            return np.nan, np.nan
-
     def assign_group(self, detalle):
         """
         Asigna un grupo a la transacción en función del texto del detalle.
         Entrada: detalle (string)
         Salida: grupo (string)
         """
-        detalle_upper = detalle.upper()
-        for keyword, group in self.group_dict.items():
-            if keyword in detalle_upper:
-                return group
-        return "CONSUMO"
+        if not self.group_dict:
+            return "CONSUMO"
+        # Entre todas las palabras encontradas gana la primera de group_dict
+        hits = (value for _, value in self.group_automaton.iter(detalle.upper()))
+        return min(hits, default=(None, "CONSUMO"))[1]
 
     def extract_text(self):
         """
         Lee el archivo PDF y lo convierte en texto, preservando los saltos de línea.
         Resultado: guarda el texto completo en self.text.
         """
-        text = ""
-        with pdfplumber.open(self.pdf_path) as pdf:
-            for page in pdf.pages:
-                extracted = page.extract_text()
-                if extracted:
-                    text += extracted + "\n"
-        self.text = text
+        # Un archivo en memoria no se comparte entre procesos: se pasan sus bytes
+        source = self.pdf_path
+        if hasattr(source, "read"):
+            source = source.read()
+        with _open_pdf(source) as pdf:
+            n = len(pdf.pages)
+            workers = min(n, os.cpu_count() or 1)
+            if n <= SERIAL_MAX_PAGES or workers <= 1:
+                parts = [page.extract_text() or "" for page in pdf.pages]
+        if n > SERIAL_MAX_PAGES and workers > 1:
+            # Cada página se procesa en un proceso aparte (pdfminer es CPU-bound)
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(source,)) as ex:
+                parts = list(ex.map(_extract_page, range(n)))
+        self.text = "\n".join(part for part in parts if part)
 
     def struct_text(self):
         """
@@ -113,58 +184,97 @@ class PDFTableExtractor:
         Salida: self.df_o (DataFrame estructurado)
         """
         lines = self.text.splitlines()
-        date_pattern = re.compile(r'\d{2}/\d{2}/\d{2,4}')
-        amount_pattern = re.compile(r'\$\s*([-–]?\d{1,3}(?:\.\d{3})*(?:[.,]\d{2})?)')
+        # Listas con el tamaño máximo posible (una transacción por línea)
+        n = len(lines)
+        self._fechas = [None] * n
+        self._lugares = [None] * n
+        self._detalles = [None] * n
+        self._valores = [None] * n
+        k = 0
         
         for line in lines:
-            if "$" in line and date_pattern.search(line):
-                date_match = date_pattern.search(line)
-                if not date_match:
-                    continue
-                fecha = date_match.group(0)
-                date_start = date_match.start()
-                # Si no hay texto antes de la fecha, se asigna "SIN LUGAR"
-                lugar = line[:date_start].strip() if date_start > 0 else "SIN LUGAR"
-                amounts = amount_pattern.findall(line)
-                if not amounts:
-                    continue
-                valor_str = amounts[-1]
-                last_dollar_index = line.rfind('$')
-                detalle = line[date_match.end():last_dollar_index].strip()
-                self.transactions.append((fecha, lugar, detalle, valor_str))
+            # Descarta rápido las líneas sin monto o sin fecha antes de usar la regex
+            if "$" not in line:
+                continue
+            if "/" not in line:
+                continue
+            m = LINE_RE.match(line)
+            if not m:
+                continue
+            fecha = m['fecha']
+            # Si no hay texto antes de la fecha, se asigna "SIN LUGAR"
+            lugar = m['lugar'].strip() if m['lugar'] else "SIN LUGAR"
+            # El detalle llega hasta el último "$" de la línea, tenga o no un monto detrás
+            detalle = line[m.end('fecha'):line.rfind('$')].strip()
+            valor_str = m['valor']
+            self._fechas[k] = fecha
+            self._lugares[k] = lugar
+            self._detalles[k] = detalle
+            self._valores[k] = valor_str
+            k += 1
         
-        self.df_o = pd.DataFrame(self.transactions, columns=["FECHA", "LUGAR", "DETALLE", "VALOR"])
-        self.df_o["VALOR"] = self.df_o["VALOR"].apply(PDFTableExtractor.convert_amount)
-        self.df_o = self.df_o[self.df_o.apply(PDFTableExtractor.transaction_validator, axis=1)]
+        # Recorta las posiciones que no se usaron
+        del self._fechas[k:], self._lugares[k:], self._detalles[k:], self._valores[k:]
+        grupos = sorted(set(self.group_dict.values()) | {"CONSUMO"})
+        if k == 0:
+            # Sin transacciones: DataFrame vacío con las mismas columnas y tipos
+            self.df_o = pd.DataFrame({
+                "FECHA": pd.Series(dtype=object),
+                "LUGAR": pd.Series(dtype=object),
+                "DETALLE": pd.Series(dtype=object),
+                "VALOR": pd.Series(dtype=float),
+                "FG_CUOTA": pd.Series(dtype=int),
+                "N_CUOTA": pd.Series(dtype=float),
+                "CUOTAS_TOT": pd.Series(dtype=float),
+                "GRUPO": pd.Categorical([], categories=grupos),
+            })
+            return self.df_o
+        self.df_o = pd.DataFrame({
+            "FECHA": self._fechas,
+            "LUGAR": self._lugares,
+            "DETALLE": self._detalles,
+            "VALOR": self._valores,
+        })
+        # Convierte los montos a float: "13.859,00" -> 13859.00, "8.990" -> 8990.0
+        valores = self.df_o["VALOR"]
+        has_comma = valores.str.contains(",", regex=False)
+        valores = valores.str.replace(".", "", regex=False)
+        valores = valores.mask(has_comma, valores.str.replace(",", ".", regex=False))
+        self.df_o["VALOR"] = pd.to_numeric(valores, errors='coerce').astype(float)
+        # Filtra las filas que no son transacciones reales
+        lugar = self.df_o["LUGAR"].replace("", "SIN LUGAR").fillna("SIN LUGAR")
+        combined = (lugar + " " + self.df_o["DETALLE"]).str.upper()
+        mask = (
+            ~combined.str.contains(EXCLUDE_RE, regex=True, na=False)
+            & ~self.df_o["DETALLE"].str.contains(DATE_RE, regex=True, na=False)
+        )
+        self.df_o = self.df_o[mask]
         self.df_o["FG_CUOTA"] = self.df_o["DETALLE"].str.contains("CUOTA", case=False, na=False).astype(int)
-        self.df_o[['N_CUOTA', 'CUOTAS_TOT']] = self.df_o.apply(
-            lambda row: PDFTableExtractor.struct_cuotas(row['DETALLE']) if row['FG_CUOTA'] else (np.nan, np.nan),
-            axis=1,
-            result_type='expand'
+        extracted = self.df_o["DETALLE"].str.extract(CUOTAS_RE)
+        self.df_o[['N_CUOTA', 'CUOTAS_TOT']] = extracted.astype(float)
+        self.df_o.loc[self.df_o['FG_CUOTA'] == 0, ['N_CUOTA', 'CUOTAS_TOT']] = np.nan
+        self.df_o['GRUPO'] = pd.Categorical(
+            [self.assign_group(d) for d in self.df_o['DETALLE'].tolist()],
+            categories=grupos,
         )
-        self.df_o['GRUPO'] = self.df_o['DETALLE'].apply(self.assign_group)
         self.df_o = self.df_o.reset_index(drop=True)
         return self.df_o
 
-    @staticmethod
-    def resume_currency_format(num):
-        """
-        Formatea el número sin decimales, por ejemplo, 200000.0 -> "200,000",
-        intercambiando comas y puntos para obtener el formato deseado: "200.000".
-        """
-        s = f"{num:,.0f}"
-        s = s.replace(",", "X").replace(".", ",").replace("X", ".")
-        return f"${s}"
-
     def transaction_resume(self):
         """
         Arma un resumen agrupado por GRUPO a partir del DataFrame de transacciones.
-        Salida: DataFrame resumen con columnas GRUPO, VALOR y PERCENTAGE.
+        Salida: DataFrame resumen con columnas GRUPO, VALOR (numérico), PERCENTAGE
+        y VALOR_FMT (VALOR formateado para mostrar, por ejemplo, "$200.000").
         """
-        self.df_resume = self.df_o[['GRUPO', 'VALOR']].groupby('GRUPO').sum().sort_values('VALOR', ascending=False)
+        self.df_resume = self.df_o.groupby('GRUPO', observed=True)[['VALOR']].sum().sort_values('VALOR', ascending=False)
         self.df_resume['PERCENTAGE'] = self.df_resume['VALOR'] / self.df_resume['VALOR'].sum()
         self.df_resume['PERCENTAGE'] = self.df_resume['PERCENTAGE'].round(2)
-        self.df_resume['VALOR'] = self.df_resume['VALOR'].apply(PDFTableExtractor.resume_currency_format)
+        # Formato sin decimales y con "." como separador de miles: 200000.0 -> "$200.000"
+        self.df_resume['VALOR_FMT'] = "$" + (
+            self.df_resume['VALOR'].round(0).astype('int64').map("{:,}".format)
+            .astype(object)  # sin filas map conserva int64 y .str fallaría
+            .str.replace(",", ".", regex=False)
+        )
         # Resetear el índice para que GRUPO quede como columna
         self.df_resume = self.df_resume.reset_index()
         return self.df_resume
@@ -174,7 +284,22 @@ class PDFTableExtractor:
 #########################
 from telegram.ext import ContextTypes  # Asegurarse de importar ContextTypes
 
-def generate_summary_pdf(df_resume, output_path="summary.pdf"):
+def _draw_table_header(pdf, cols, col_width, row_height):
+    """
+    Dibuja la fila de encabezados de la tabla y deja la fuente lista para el cuerpo.
+    """
+    pdf.set_font("Arial", "B", 12)
+    pdf.set_fill_color(0, 102, 204)  # Fondo azul para encabezados
+    pdf.set_text_color(255, 255, 255)  # Texto blanco en encabezados
+    for col in cols:
+        pdf.cell(col_width, row_height, str(col), border=1, fill=True, align="C")
+    pdf.ln(row_height)
+    pdf.set_font("Arial", "", 10)
+    pdf.set_text_color(0, 0, 0)  # Texto negro
+
+def generate_summary_pdf(df_resume):
+    # Solo se muestran las columnas de presentación, con VALOR ya formateado
+    df_resume = df_resume[['GRUPO', 'VALOR_FMT', 'PERCENTAGE']].rename(columns={'VALOR_FMT': 'VALOR'})
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=15)
     pdf.add_page()
@@ -185,52 +310,39 @@ def generate_summary_pdf(df_resume, output_path="summary.pdf"):
     pdf.cell(0, 10, txt="Resumen de Transacciones", ln=True, align="C")
     pdf.ln(5)
     
-    # Configuración de los encabezados de la tabla
-    pdf.set_font("Arial", "B", 12)
-    pdf.set_fill_color(0, 102, 204)  # Fondo azul para encabezados
-    pdf.set_text_color(255, 255, 255)  # Texto blanco en encabezados
-    
     # Calcula el ancho disponible y el ancho de cada columna
     page_width = pdf.w - 2 * pdf.l_margin
-    n_cols = len(df_resume.columns)
-    col_width = page_width / n_cols
+    cols = list(df_resume.columns)
+    col_width = page_width / len(cols)
     row_height = 10
     
-    # Dibuja los encabezados
-    for col in df_resume.columns:
-        pdf.cell(col_width, row_height, str(col), border=1, fill=True, align="C")
-    pdf.ln(row_height)
-    
-    # Configura el cuerpo de la tabla
-    pdf.set_font("Arial", "", 10)
-    pdf.set_text_color(0, 0, 0)  # Texto negro
+    # Dibuja los encabezados y deja configurado el cuerpo de la tabla
+    _draw_table_header(pdf, cols, col_width, row_height)
     fill = False  # Para alternar colores de fondo en las filas
     
-    for index, row in df_resume.iterrows():
+    # Textos de cada columna calculados de una vez; PERCENTAGE se muestra como "70%"
+    # Si los totales suman 0 el porcentaje es NaN y se muestra "nan%"
+    display = {col: df_resume[col].astype(str).tolist() for col in cols if col != 'PERCENTAGE'}
+    display['PERCENTAGE'] = df_resume['PERCENTAGE'].map(lambda p: f"{p:.0%}").tolist()
+    
+    for i in range(len(df_resume)):
         # Si se supera el límite vertical, se agrega una nueva página y se redibujan los encabezados
         if pdf.get_y() > 250:
             pdf.add_page()
-            pdf.set_font("Arial", "B", 12)
-            pdf.set_fill_color(0, 102, 204)
-            pdf.set_text_color(255, 255, 255)
-            for col in df_resume.columns:
-                pdf.cell(col_width, row_height, str(col), border=1, fill=True, align="C")
-            pdf.ln(row_height)
-            pdf.set_font("Arial", "", 10)
-            pdf.set_text_color(0, 0, 0)
+            _draw_table_header(pdf, cols, col_width, row_height)
         # Asigna un color de fondo alternado para cada fila
         if fill:
             pdf.set_fill_color(230, 230, 230)  # Gris claro
         else:
             pdf.set_fill_color(255, 255, 255)  # Blanco
-        for col in df_resume.columns:
-            pdf.cell(col_width, row_height, str(row[col]), border=1, fill=True, align="C")
+        for col in cols:
+            pdf.cell(col_width, row_height, display[col][i], border=1, fill=True, align="C")
         pdf.ln(row_height)
         fill = not fill  # Alterna el fondo para la siguiente fila
     
     # Opcional: se puede agregar número de página aquí
-    pdf.output(output_path)
-    return output_path
+    # Devuelve el PDF en memoria (FPDF 1.x entrega un str latin-1)
+    return pdf.output(dest='S').encode('latin-1')
 
 # Handlers asíncronos para el bot (versión 20+)
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -239,69 +351,24 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def handle_document(update: Update, context: ContextTypes.DEFAULT_TYPE):
     document = update.message.document
     file = await context.bot.get_file(document.file_id)
-    file_path = f"temp_{document.file_name}"
-    await file.download_to_drive(file_path)
+    # Descarga el PDF directo a memoria, sin archivo temporal
+    buf = io.BytesIO(await file.download_as_bytearray())
     await update.message.reply_text("Procesando el PDF, por favor espera...")
     
-    # Diccionario de grupos (ajústalo según tus necesidades)
-    group_dict = {
-        'COMERCIAL DECOSTORE': 'DECORACION',
-        'MERCADO PAGO 4 TCOM': 'GYM',
-        'UBER EATS': 'DELIVERY',
-        'UBER TRIP': 'MOVILIDAD',
-        'UBER': 'MOVILIDAD',
-        'TAXI': 'MOVILIDAD',
-        'RAPPI': 'DELIVERY',
-        'NIU': 'DELIVERY',
-        'MED': 'MEDICO',
-        'CRUZ VERDE': 'MEDICO',
-        'AHUM': 'MEDICO',
-        'SII': 'SII',
-        'SODIMAC': 'DECORACION',
-        'TOTTUS': 'SUPERMERCADO',
-        'JUMBO': 'SUPERMERCADO',
-        'BIRRA': 'SALIDA/BAR',
-        'BAR': 'SALIDA/BAR',
-        'ENTEL': 'SERVICIOS',
-        'AGUAS CORDILLERA': 'SUPERMERCADO',
-        'PLAYSTATION': 'SUBSCRIPCION',
-        'BOCAJUNIORS': 'SUBSCRIPCION',
-        'NETFLIX': 'SUBSCRIPCION',
-        'AMAZON': 'SUBSCRIPCION',
-        'APPLE': 'SUBSCRIPCION',
-        'GUACAMOLE': 'DELIVERY',
-        'FANTASILANDIA': 'SALIDA/BAR',
-        'MACONLINE': 'SEGURO',
-        'LATAM': 'VUELOS',
-        'COMUNIDAD FELIZ': 'SERVICIOS',
-        'TICKET MASTER': 'SALIDAS/BAR',
-        'NUI SUSHI': 'DELIVERY'
-    }
-    
-    csv_path = "transactions.csv"
-    summary_pdf_path = "summary.pdf"
-    
     try:
         # Procesa el PDF usando la clase y obtiene los DataFrames
-        df_output, resumen = PDFTableExtractor(file_path, group_dict)
-        # Guarda el CSV completo con codificación adecuada
-        df_output.to_csv(csv_path, index=False, encoding='utf-8-sig')
+        # En un hilo aparte para no bloquear el event loop del bot
+        df_output, resumen = await asyncio.to_thread(PDFTableExtractor, buf)
+        # Arma el CSV completo en memoria con codificación adecuada
+        csv_buf = io.BytesIO(df_output.to_csv(index=False).encode('utf-8-sig'))
         # Genera el PDF resumen con paginación
-        summary_pdf_path = generate_summary_pdf(resumen, "summary.pdf")
-        # Envía los archivos al usuario
-        await update.message.reply_document(document=open(csv_path, "rb"), filename="transactions.csv")
-        await update.message.reply_document(document=open(summary_pdf_path, "rb"), filename="summary.pdf")
+        summary_pdf = generate_summary_pdf(resumen)
+        # Envía los archivos al usuario sin pasar por disco
+        await update.message.reply_document(document=InputFile(csv_buf, filename="transactions.csv"))
+        await update.message.reply_document(document=InputFile(summary_pdf, filename="summary.pdf"))
         await update.message.reply_text("¡Proceso completado!")
     except Exception as e:
         await update.message.reply_text(f"Error al procesar el PDF: {e}")
-    finally:
-        # Elimina archivos temporales
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        if os.path.exists(csv_path):
-            os.remove(csv_path)
-        if os.path.exists(summary_pdf_path):
-            os.remove(summary_pdf_path)
 
 def main():
     # Reemplaza 'YOUR_BOT_TOKEN' con el token real de tu bot